@@ -1,12 +1,13 @@
 from crewai import Agent, LLM
-from config import api_key
+from config import api_key, LLM_BASE_URL
 
 def create_llm():
     """Initialize and return LLM instance"""
     return LLM(
         model="gemini/gemini-2.0-flash",
         temperature=0.3,
-        api_key=api_key
+        api_key=api_key,
+        base_url=LLM_BASE_URL
     )
 
 def create_3_agent_crew():
@@ -0,0 +1,143 @@
+import argparse
+import functools
+import os
+from svg_utils import open_input_svg, save_output_svg
+from agents import create_3_agent_crew
+from instruction_processor import break_instructions_smart, run_instruction_with_retry
+from instruction_planner import plan_instructions, print_plan_report, target_svg_tags
+from job_store import (
+    COMPLETED, open_job_store, get_or_create_job, save_instructions, load_instructions,
+    mark_instruction_completed, mark_instruction_failed, finish_job,
+    list_failed_instructions, list_jobs_without_breakdown, requeue_failed_instructions
+)
+
+# Agents are created on first use and shared by every job in the process
+shared_crew = functools.lru_cache(maxsize=None)(create_3_agent_crew)
+
+def run_job(conn, user_prompt, original_svg, agents=None):
+    """Run one prompt against an SVG, resuming from the checkpoint store
+
+    Completed steps are never re-run: the instruction breakdown and every
+    completed instruction are read back from the store. Instructions run in
+    order and the job stops at the first failure, so a resumed job continues
+    from that instruction. Returns (job_id, final_svg, status).
+    """
+    job = get_or_create_job(conn, user_prompt, original_svg)
+    job_id = job["job_id"]
+    print(f"\n JOB {job_id} (status: {job['status']})")
+
+    if job["status"] == COMPLETED:
+        print(" Job already completed, reusing stored result")
+        return job_id, job["current_svg"], COMPLETED
+
+    # Step 1: Break instructions (or reuse the stored breakdown)
+    rows = load_instructions(conn, job_id)
+    if rows:
+        print(f"\n STEP 1: Reusing stored breakdown")
+    else:
+        print(f"\n STEP 1: Breaking down instructions (keeping complete gradient specs together)")
+        try:
+            breakdown = break_instructions_smart(user_prompt, fallback=False)
+        except Exception as e:
+            # Never checkpoint a fallback breakdown; the next run asks the LLM again
+            print(f" Breakdown failed, leaving job to be retried: {e}")
+            return job_id, job["original_svg"], finish_job(conn, job_id)
+        instructions, plan_report = plan_instructions(breakdown)
+        print_plan_report(plan_report)
+        save_instructions(conn, job_id, instructions)
+        rows = load_instructions(conn, job_id)
+
+    print(f" Broken down into {len(rows)} complete instructions:")
+    for row in rows:
+        print(f"   {row['position'] + 1}. {row['instruction']} [{row['status']}]")
+
+    # Steps run strictly in order: resume at the first step that is not completed,
+    # on top of the output of the completed step right before it
+    resume_at = next((i for i, row in enumerate(rows) if row["status"] != COMPLETED), len(rows))
+    todo = rows[resume_at:]
+    current_svg = rows[resume_at - 1]["output_svg"] if resume_at else job["original_svg"]
+
+    # Step 2: Create the 3-agent crew only if there is work left to do
+    if todo and agents is None:
+        print(f"\n STEP 2: Creating 3-agent crew")
+        agents = shared_crew()
+        print(" Agents created: Gradient Parser → SVG Modifier → Integrity Checker")
+
+    # Step 3: Process remaining instructions, stopping at the first failure so later
+    # steps never run on an SVG that is missing an earlier one
+    print(f"\n STEP 3: Processing {len(todo)} remaining instruction(s) with 3-agent crew")
+
+    for row in todo:
+        print(f"\n{'='*60}")
+        print(f" INSTRUCTION {row['position'] + 1}/{len(rows)}")
+        print(f"{'='*60}")
+
+        outcome = run_instruction_with_retry(row["instruction"], current_svg, *agents)
+        if outcome["status"] == COMPLETED:
+            current_svg = outcome["svg"]
+            mark_instruction_completed(
+                conn, job_id, row["position"], current_svg, outcome["stage_outputs"], outcome["attempts"]
+            )
+            print(f" Instruction {row['position'] + 1} completed")
+        else:
+            mark_instruction_failed(conn, job_id, row["position"], outcome["error"], outcome["attempts"])
+            print(f" Instruction {row['position'] + 1} failed: {outcome['error']}")
+            print(f" Stopping job; {len(rows) - row['position'] - 1} later instruction(s) left pending")
+            break
+
+    status = finish_job(conn, job_id)
+    return job_id, current_svg, status
+
+def run_batch(prompts_file, output_dir):
+    """Run every prompt in a file (one per line) as a resumable job"""
+    with open(prompts_file, 'r') as f:
+        prompts = [line.strip() for line in f if line.strip()]
+
+    conn = open_job_store()
+    os.makedirs(output_dir, exist_ok=True)
+
+    for i, user_prompt in enumerate(prompts, 1):
+        print(f"\n BATCH ITEM {i}/{len(prompts)}: \"{user_prompt}\"")
+        original_svg, document = open_input_svg(target_svg_tags(user_prompt))
+        job_id, final_svg, status = run_job(conn, user_prompt, original_svg)
+        save_output_svg(final_svg, document, os.path.join(output_dir, f"{job_id}.svg"))
+        if document is not None:
+            document.close()
+        print(f" Job {job_id}: {status}")
+
+def print_failed(conn):
+    """Print failed instructions for re-queueing"""
+    failed = list_failed_instructions(conn)
+    print(f"{len(failed)} failed instruction(s)")
+    for row in failed:
+        print(f"  {row['job_id']} #{row['position'] + 1} (attempts: {row['attempts']}): {row['instruction']}")
+        print(f"      prompt: {row['user_prompt']}")
+        print(f"      error: {row['error']}")
+    unplanned = list_jobs_without_breakdown(conn)
+    if unplanned:
+        print(f"{len(unplanned)} job(s) without a breakdown (re-run the prompt to retry)")
+        for row in unplanned:
+            print(f"  {row['job_id']}: {row['user_prompt']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run gradient prompts as resumable batch jobs")
+    parser.add_argument("prompts_file", nargs="?", help="file with one prompt per line")
+    parser.add_argument("--output-dir", default="batch_output", help="directory for per-job output SVGs")
+    parser.add_argument("--list-failed", action="store_true", help="list failed instructions and exit")
+    parser.add_argument("--requeue-failed", action="store_true", help="reset failed instructions to pending and exit")
+    args = parser.parse_args()
+
+    if args.list_failed or args.requeue_failed:
+        conn = open_job_store()
+        if args.list_failed:
+            print_failed(conn)
+        if args.requeue_failed:
+            print(f"Re-queued {requeue_failed_instructions(conn)} failed instruction(s)")
+        return
+
+    if not args.prompts_file:
+        parser.error("prompts_file is required unless --list-failed or --requeue-failed is given")
+    run_batch(args.prompts_file, args.output_dir)
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,20 @@ load_dotenv()
 INPUT_SVG_FILE = "input.svg"
 OUTPUT_SVG_FILE = "output.svg"
 
+# Optional override for the Gemini endpoint (e.g. the local stand-in server used for load tests)
+LLM_BASE_URL = os.getenv("GEMINI_API_BASE")
+
+# Seconds to wait after the first rate-limit error; later retries wait multiples of this
+RETRY_BASE_WAIT = float(os.getenv("RETRY_BASE_WAIT", "20"))
+
 # Get API key
 api_key = os.getenv("GOOGLE_API_KEY")
 if not api_key:
     print("Please set GOOGLE_API_KEY in .env file")
-    exit(1) 
\ No newline at end of file
+    exit(1)
+
+# SQLite checkpoint store for resumable jobs
+JOB_STORE_FILE = "jobs.db"
+
+# Inputs larger than this are memory-mapped and edited through a compact skeleton
+LARGE_SVG_BYTES = 256 * 1024
@@ -0,0 +1,239 @@
+import re
+
+# Each instruction runs through the parser, modifier and integrity checker
+LLM_CALLS_PER_INSTRUCTION = 3
+
+SHAPES = {
+    "rectangle": "rect", "rectangles": "rect", "rect": "rect", "rects": "rect",
+    "square": "rect", "squares": "rect",
+    "circle": "circle", "circles": "circle",
+    "ellipse": "ellipse", "ellipses": "ellipse", "oval": "ellipse", "ovals": "ellipse",
+    "path": "path", "paths": "path",
+    "polygon": "polygon", "polygons": "polygon", "triangle": "polygon", "triangles": "polygon",
+    "star": "polygon", "stars": "polygon",
+    "line": "line", "lines": "line",
+    "text": "text",
+}
+
+# SVG elements each shape word may refer to
+SHAPE_TAGS = {
+    "rect": {"rect"},
+    "circle": {"circle", "ellipse"},
+    "ellipse": {"ellipse", "circle"},
+    "path": {"path"},
+    "polygon": {"polygon", "polyline", "path"},
+    "line": {"line", "polyline", "path"},
+    "text": {"text", "tspan"},
+}
+
+COLOR_NAMES = {
+    "red", "green", "blue", "yellow", "orange", "purple", "pink", "black", "white",
+    "gray", "grey", "brown", "cyan", "magenta", "teal", "navy", "violet", "gold",
+    "silver", "maroon", "lime", "indigo", "turquoise", "beige", "crimson",
+}
+
+# The only words a plannable step may contain besides its target and colours.
+# Anything else (borders, sizes, "its current color", named palettes) means the
+# step may do more than set a fill, so it is kept in place as a barrier
+FILL_WORDS = {
+    "make", "turn", "change", "set", "give", "add", "apply", "paint", "color", "colour", "fill", "use",
+    "a", "an", "the", "to", "on", "onto", "in", "of", "with", "have", "has", "from", "and", "into",
+    "solid", "gradient", "linear", "radial", "vertical", "horizontal", "diagonal",
+}
+
+COLOR_RE = re.compile(r"#[0-9a-fA-F]{3,8}\b|\b(?:" + "|".join(sorted(COLOR_NAMES)) + r")\b", re.IGNORECASE)
+TARGET_RE = re.compile(
+    r"\b(?:(all|every|each)\s+(?:the\s+)?)?(?:(#[0-9a-fA-F]{3,8}|" + "|".join(sorted(COLOR_NAMES)) + r")\s+)?("
+    + "|".join(sorted(SHAPES, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+
+def parse_instruction_spec(instruction):
+    """Parse an instruction into the same fields the Gradient Parser Agent extracts
+
+    This is a local parse used only for planning. Only steps made of a single
+    target and fill wording (FILL_WORDS, colour names, hex codes) are understood;
+    for anything else the "target" key is None, which makes the planner treat the
+    step as a barrier.
+    """
+    text = instruction.strip()
+    lowered = text.lower()
+    spec = {
+        "gradient_type": "none",
+        "direction": None,
+        "start_color": None,
+        "end_color": None,
+        "target_element": None,
+        "target": None,
+        "target_span": None,
+        "family": None,
+        "qualifier": None,
+        "everything": False,
+    }
+
+    if "radial" in lowered:
+        spec["gradient_type"] = "radial"
+    elif "gradient" in lowered:
+        spec["gradient_type"] = "linear"
+    for direction in ("vertical", "horizontal", "diagonal"):
+        if direction in lowered:
+            spec["direction"] = direction
+            break
+
+    targets = list(TARGET_RE.finditer(text))
+    if len(targets) != 1:
+        return spec
+    match = targets[0]
+    if not _is_fill_wording(text[:match.start()] + " " + text[match.end():]):
+        return spec
+    quantifier, qualifier, shape = match.groups()
+
+    colors = [
+        c.group(0).lower() for c in COLOR_RE.finditer(text)
+        if not (match.start() <= c.start() < match.end())
+    ]
+    if not colors and spec["gradient_type"] == "none":
+        return spec
+
+    spec["start_color"] = colors[0] if colors else None
+    spec["end_color"] = colors[1] if len(colors) > 1 else None
+    spec["target_element"] = match.group(0)
+    # Two steps address the same element only if their whole target phrases match
+    spec["target"] = " ".join(w for w in match.group(0).lower().split() if w not in ("the", "a", "an"))
+    spec["target_span"] = match.span()
+    spec["family"] = SHAPES[shape.lower()]
+    spec["qualifier"] = qualifier.lower() if qualifier else None
+    spec["everything"] = bool(quantifier) or shape.lower().endswith("s")
+    return spec
+
+def _is_fill_wording(text):
+    """True if text holds nothing but FILL_WORDS, colour names and hex codes"""
+    text = text.lower()
+    if not re.fullmatch(r"[a-z0-9#\s,.;!-]*", text):
+        return False
+    return all(
+        word in FILL_WORDS or word in COLOR_NAMES or re.fullmatch(r"#[0-9a-f]{3}|#[0-9a-f]{6}", word)
+        for word in re.findall(r"#?[a-z0-9]+", text)
+    )
+
+def target_svg_tags(text):
+    """Return the SVG tags a prompt can touch, or None if it may touch anything
+
+    Elements outside these tags are hidden from the agents, so this is as strict
+    as the planner: unless every word outside the recognised target phrases is
+    fill wording, the prompt may refer to something else ("the background",
+    "the heart") and everything is kept.
+    """
+    targets = list(TARGET_RE.finditer(text))
+    if not targets:
+        return None
+    rest, pos = [], 0
+    for match in targets:
+        rest.append(text[pos:match.start()])
+        pos = match.end()
+    rest.append(text[pos:])
+    if not _is_fill_wording(" ".join(rest)):
+        return None
+    tags = set()
+    for match in targets:
+        tags |= SHAPE_TAGS[SHAPES[match.group(3).lower()]]
+    return tags
+
+def _without_target(step):
+    """The instruction text with its target phrase cut out, normalised for comparison"""
+    start, end = step["spec"]["target_span"]
+    text = step["instruction"][:start] + " " + step["instruction"][end:]
+    return " ".join(text.lower().split()).rstrip(".!")
+
+def _overwrites(later, earlier):
+    """True if the later step replaces everything the earlier step did"""
+    return later["target"] is not None and later["target"] == earlier["target"]
+
+def _selects_by_color_of(later, earlier):
+    """True if the later step picks its target by a colour the earlier step sets"""
+    return later["qualifier"] is not None and later["qualifier"] in {earlier["start_color"], earlier["end_color"]}
+
+def _depends(later, earlier):
+    """True if the two steps must keep their relative order"""
+    if later["target"] is None or earlier["target"] is None:
+        return True
+    # Different words for the same kind of element ("rectangle"/"square") may mean the same one
+    if later["family"] == earlier["family"]:
+        return True
+    # "make the circle red" then "give the red rectangle ..." selects by a colour an earlier step may set
+    return _selects_by_color_of(later, earlier) or _selects_by_color_of(earlier, later)
+
+def _merge_text(first, second):
+    """Rewrite the first instruction so it also targets the second one's element"""
+    start, end = first["spec"]["target_span"]
+    text = first["instruction"]
+    article = "" if second["spec"]["everything"] else "the "
+    return text[:start] + f"{text[start:end]} and {article}{second['spec']['target_element']}" + text[end:]
+
+def plan_instructions(instructions):
+    """Drop overwritten steps, merge identical fills on different targets and keep dependency order
+
+    Returns (planned_instructions, report). The report lists what was dropped or
+    merged and how many crew runs and LLM calls the plan avoided.
+    """
+    steps = [
+        {"instruction": instruction, "spec": parse_instruction_spec(instruction)}
+        for instruction in instructions
+    ]
+    report = {"dropped": [], "merged": []}
+
+    # Pass 1: a step whose fill is fully replaced by a later step does nothing, unless
+    # something in between cannot be understood or selects by a colour the step sets
+    kept = []
+    for i, step in enumerate(steps):
+        spec = step["spec"]
+        overwritten_by = None
+        for later in steps[i + 1:]:
+            if _overwrites(later["spec"], spec):
+                overwritten_by = later
+                break
+            if later["spec"]["target"] is None or (spec["target"] and _selects_by_color_of(later["spec"], spec)):
+                break
+        if overwritten_by is not None:
+            report["dropped"].append((step["instruction"], overwritten_by["instruction"]))
+        else:
+            kept.append(step)
+
+    # Pass 2: fold identical requests on different targets into the earliest such step,
+    # moving the later step forward only past steps it has no dependency on
+    planned = []
+    for step in kept:
+        spec = step["spec"]
+        merged = False
+        if spec["target"] is not None:
+            for j in range(len(planned) - 1, -1, -1):
+                candidate = planned[j]
+                if any(_depends(spec, other) for other in candidate["specs"]):
+                    break
+                # Only merge requests that are word-for-word the same apart from the target
+                if len(candidate["specs"]) == 1 and _without_target(candidate) == _without_target(step):
+                    merged_text = _merge_text(candidate, step)
+                    report["merged"].append(((candidate["instruction"], step["instruction"]), merged_text))
+                    planned[j] = dict(candidate, instruction=merged_text, specs=candidate["specs"] + [spec])
+                    merged = True
+                    break
+        if not merged:
+            planned.append(dict(step, specs=[spec]))
+
+    avoided = len(instructions) - len(planned)
+    report["original_count"] = len(instructions)
+    report["planned_count"] = len(planned)
+    report["crew_runs_avoided"] = avoided
+    report["llm_calls_avoided"] = avoided * LLM_CALLS_PER_INSTRUCTION
+    return [step["instruction"] for step in planned], report
+
+def print_plan_report(report):
+    """Print what the planning pass changed"""
+    print("\n=== INSTRUCTION PLANNING ===")
+    for dropped, replaced_by in report["dropped"]:
+        print(f"Dropped \"{dropped}\" (overwritten by \"{replaced_by}\")")
+    for (first, second), merged in report["merged"]:
+        print(f"Merged \"{first}\" + \"{second}\" -> \"{merged}\"")
+    print(f"Planned {report['planned_count']} of {report['original_count']} instructions, "
+          f"avoiding {report['crew_runs_avoided']} crew runs "
+          f"({report['llm_calls_avoided']} LLM calls)")
@@ -2,9 +2,21 @@ import json
 import time
 from crewai import Task, Crew
 from agents import create_llm
+from config import RETRY_BASE_WAIT
+from svg_stream import placeholder_indices, check_placeholders
 
-def break_instructions_smart(user_prompt):
-    """Break instructions intelligently - keeping complete gradient specs together"""
+# Large inputs are edited as a skeleton (see svg_stream.py) whose elided regions must survive untouched
+RAW_PLACEHOLDER_NOTE = '''
+        IMPORTANT: Copy every "raw:N" attribute value and every <!--raw:N--> comment exactly
+        once and exactly as it is, even though "raw:N" is not valid path data. They stand
+        for content that is restored when the file is saved; do not fix, remove or repeat them.'''
+
+def break_instructions_smart(user_prompt, fallback=True):
+    """Break instructions intelligently - keeping complete gradient specs together
+
+    With fallback=False, errors and empty breakdowns raise instead of returning
+    [user_prompt], so callers can tell a real breakdown from the fallback.
+    """
     llm = create_llm()
     
     print("\n=== INSTRUCTION BREAKDOWN PROCESS ===")
@@ -54,6 +66,8 @@ Output: """
             
             instructions = json.loads(json_str)
             print(f"\nParsed instructions (JSON): {instructions}")
+            if not isinstance(instructions, list) or not instructions or not all(isinstance(i, str) and i.strip() for i in instructions):
+                raise ValueError("Breakdown is not a non-empty list of instructions")
             return instructions
         else:
             print("\nNo JSON array found, falling back to line-by-line parsing")
@@ -77,43 +91,80 @@ Output: """
                     print(f"Line {i}: '{line}' (skipped - bracket)")
             
             print(f"\nFinal instructions from fallback: {instructions}")
-            return instructions if instructions else [user_prompt]
+            if not instructions:
+                raise ValueError("No instructions found in LLM response")
+            return instructions
             
     except Exception as e:
         print(f"\nError in instruction processing: {str(e)}")
+        if not fallback:
+            raise
         print("Falling back to original prompt")
         return [user_prompt]
 
 def process_single_instruction_with_retry(instruction, current_svg, gradient_parser, svg_modifier, integrity_checker, max_retries=3):
     """Process a single instruction with retry logic for rate limiting"""
+    outcome = run_instruction_with_retry(
+        instruction, current_svg, gradient_parser, svg_modifier, integrity_checker, max_retries
+    )
+    return outcome["svg"]
+
+def run_instruction_with_retry(instruction, current_svg, gradient_parser, svg_modifier, integrity_checker, max_retries=3):
+    """Process a single instruction with retries and report the outcome for checkpointing
+
+    Returns a dict with the resulting "svg", "status" ("completed" or "failed"),
+    "error", "attempts" and the raw per-agent "stage_outputs".
+    """
     
     print("\n=== INSTRUCTION PROCESSING WITH RETRY ===")
     print(f"Processing instruction: {instruction}")
     print(f"Current SVG length: {len(current_svg)} characters")
     
+    placeholder_count = len(placeholder_indices(current_svg))
+    error = None
     for attempt in range(max_retries):
         try:
             print(f"\nAttempt {attempt + 1}/{max_retries}")
-            result = process_single_instruction(instruction, current_svg, gradient_parser, svg_modifier, integrity_checker)
+            result, stage_outputs = run_instruction_crew(instruction, current_svg, gradient_parser, svg_modifier, integrity_checker)
+            if '<svg' not in result or '</svg>' not in result:
+                print(f"Crew result on attempt {attempt + 1} contains no SVG")
+                return {"svg": current_svg, "status": "failed", "error": "Crew result contained no SVG",
+                        "attempts": attempt + 1, "stage_outputs": stage_outputs}
+            if placeholder_count:
+                try:
+                    check_placeholders(result, placeholder_count)
+                except ValueError as e:
+                    # A damaged skeleton would lose or duplicate elided content when saved
+                    print(f"Crew result on attempt {attempt + 1} broke the skeleton: {e}")
+                    return {"svg": current_svg, "status": "failed", "error": str(e),
+                            "attempts": attempt + 1, "stage_outputs": stage_outputs}
             print(f"Successfully processed instruction on attempt {attempt + 1}")
-            return result
+            return {"svg": result, "status": "completed", "error": None,
+                    "attempts": attempt + 1, "stage_outputs": stage_outputs}
         except Exception as e:
+            error = str(e)
             print(f"\nError on attempt {attempt + 1}: {str(e)}")
             if "429" in str(e) or "rate" in str(e).lower():
-                wait_time = (attempt + 1) * 20  # 20, 40, 60 seconds
+                wait_time = (attempt + 1) * RETRY_BASE_WAIT  # 20, 40, 60 seconds by default
                 print(f"Rate limit hit. Waiting {wait_time} seconds before retry {attempt + 1}/{max_retries}...")
                 time.sleep(wait_time)
                 if attempt == max_retries - 1:
                     print("Max retries reached. Skipping this instruction.")
-                    return current_svg
             else:
                 print(f"Non-rate-limit error: {e}")
-                return current_svg
+                return {"svg": current_svg, "status": "failed", "error": error,
+                        "attempts": attempt + 1, "stage_outputs": []}
     
-    return current_svg
+    return {"svg": current_svg, "status": "failed", "error": error,
+            "attempts": max_retries, "stage_outputs": []}
 
 def process_single_instruction(instruction, current_svg, gradient_parser, svg_modifier, integrity_checker):
     """Process a single instruction using the 3-agent crew"""
+    final_svg, _ = run_instruction_crew(instruction, current_svg, gradient_parser, svg_modifier, integrity_checker)
+    return final_svg
+
+def run_instruction_crew(instruction, current_svg, gradient_parser, svg_modifier, integrity_checker):
+    """Run the 3-agent crew and return the final SVG plus each agent's raw output"""
     
     print(f"\n=== PROCESSING SINGLE INSTRUCTION ===")
     print(f"Instruction: {instruction}")
@@ -173,7 +224,7 @@ def process_single_instruction(instruction, current_svg, gradient_parser, svg_mo
            - diagonal: x1="0%" y1="0%" x2="100%" y2="100%"
         6. Create proper stop elements with offset and style attributes
         7. Update target element's fill attribute to reference gradient: fill="url(#gradientId)"
-        8. Preserve all other elements unchanged
+        8. Preserve all other elements unchanged{RAW_PLACEHOLDER_NOTE if "raw:" in current_svg else ""}
         
         Return complete modified SVG code.
         ''',
@@ -195,7 +246,7 @@ def process_single_instruction(instruction, current_svg, gradient_parser, svg_mo
         4. No missing or broken references
         5. Well-formed SVG structure
         6. Proper stop elements with offset and style attributes
-        
+        {RAW_PLACEHOLDER_NOTE if "raw:" in current_svg else ""}
         Fix any issues and return the final validated SVG.
         ''',
         expected_output='Final validated SVG code',
@@ -218,6 +269,7 @@ def process_single_instruction(instruction, current_svg, gradient_parser, svg_mo
     # Extract clean SVG from result
     print("\nProcessing crew result...")
     final_svg = str(result)
+    stage_outputs = [getattr(output, "raw", str(output)) for output in getattr(result, "tasks_output", [])]
     print(f"Raw result length: {len(final_svg)} characters")
     
     if '<svg' in final_svg and '</svg>' in final_svg:
@@ -228,4 +280,4 @@ def process_single_instruction(instruction, current_svg, gradient_parser, svg_mo
     else:
         print("Warning: Could not find SVG tags in result")
     
-    return final_svg 
\ No newline at end of file
+    return final_svg, stage_outputs
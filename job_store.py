@@ -0,0 +1,149 @@
+import hashlib
+import sqlite3
+import time
+from config import JOB_STORE_FILE
+
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    user_prompt TEXT NOT NULL,
+    original_svg TEXT NOT NULL,
+    current_svg TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS instructions (
+    job_id TEXT NOT NULL REFERENCES jobs(job_id),
+    position INTEGER NOT NULL,
+    instruction TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    parse_output TEXT,
+    modify_output TEXT,
+    validate_output TEXT,
+    output_svg TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, position)
+);
+"""
+
+def open_job_store(path=JOB_STORE_FILE):
+    """Open (and create if needed) the SQLite checkpoint store"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def make_job_id(user_prompt, original_svg):
+    """Derive a stable job id so re-running the same prompt on the same SVG resumes it"""
+    digest = hashlib.sha256()
+    digest.update(user_prompt.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(original_svg.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def get_or_create_job(conn, user_prompt, original_svg):
+    """Return the stored job for this prompt/SVG pair, creating it if it does not exist"""
+    job_id = make_job_id(user_prompt, original_svg)
+    now = time.time()
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, user_prompt, original_svg, original_svg, PENDING, now, now)
+        )
+    return conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+def save_instructions(conn, job_id, instructions):
+    """Record the instruction breakdown for a job (replaces any previous breakdown)"""
+    now = time.time()
+    with conn:
+        conn.execute("DELETE FROM instructions WHERE job_id = ?", (job_id,))
+        conn.executemany(
+            "INSERT INTO instructions (job_id, position, instruction, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(job_id, i, instruction, PENDING, now) for i, instruction in enumerate(instructions)]
+        )
+
+def load_instructions(conn, job_id):
+    """Return all instruction rows for a job in execution order"""
+    return conn.execute(
+        "SELECT * FROM instructions WHERE job_id = ? ORDER BY position", (job_id,)
+    ).fetchall()
+
+def mark_instruction_completed(conn, job_id, position, output_svg, stage_outputs, attempts):
+    """Checkpoint a completed instruction and advance the job's current SVG"""
+    now = time.time()
+    parse_output, modify_output, validate_output = (list(stage_outputs) + [None] * 3)[:3]
+    with conn:
+        conn.execute(
+            """UPDATE instructions
+               SET status = ?, attempts = attempts + ?, error = NULL, parse_output = ?,
+                   modify_output = ?, validate_output = ?, output_svg = ?, updated_at = ?
+               WHERE job_id = ? AND position = ?""",
+            (COMPLETED, attempts, parse_output, modify_output, validate_output, output_svg, now, job_id, position)
+        )
+        conn.execute(
+            "UPDATE jobs SET current_svg = ?, updated_at = ? WHERE job_id = ?",
+            (output_svg, now, job_id)
+        )
+
+def mark_instruction_failed(conn, job_id, position, error, attempts):
+    """Checkpoint a failed instruction so it can be retried or re-queued later"""
+    with conn:
+        conn.execute(
+            """UPDATE instructions SET status = ?, attempts = attempts + ?, error = ?, updated_at = ?
+               WHERE job_id = ? AND position = ?""",
+            (FAILED, attempts, error, time.time(), job_id, position)
+        )
+
+def finish_job(conn, job_id):
+    """Set the job status from its instructions: completed only if there is a breakdown and every step completed"""
+    statuses = {row["status"] for row in load_instructions(conn, job_id)}
+    status = COMPLETED if statuses and statuses <= {COMPLETED} else FAILED
+    with conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+            (status, time.time(), job_id)
+        )
+    return status
+
+def list_failed_instructions(conn, job_id=None):
+    """List failed instructions (optionally for one job) for re-queueing"""
+    query = """SELECT i.job_id, i.position, i.instruction, i.attempts, i.error, j.user_prompt
+               FROM instructions i JOIN jobs j ON j.job_id = i.job_id
+               WHERE i.status = ?"""
+    params = [FAILED]
+    if job_id:
+        query += " AND i.job_id = ?"
+        params.append(job_id)
+    return conn.execute(query + " ORDER BY i.job_id, i.position", params).fetchall()
+
+def list_jobs_without_breakdown(conn):
+    """List failed jobs whose instruction breakdown never succeeded"""
+    return conn.execute(
+        """SELECT job_id, user_prompt FROM jobs
+           WHERE status = ? AND NOT EXISTS (SELECT 1 FROM instructions i WHERE i.job_id = jobs.job_id)
+           ORDER BY created_at""",
+        (FAILED,)
+    ).fetchall()
+
+def requeue_failed_instructions(conn, job_id=None):
+    """Reset failed instructions to pending; returns the number re-queued"""
+    query = "UPDATE instructions SET status = ?, updated_at = ? WHERE status = ?"
+    params = [PENDING, time.time(), FAILED]
+    if job_id:
+        query += " AND job_id = ?"
+        params.append(job_id)
+    with conn:
+        cursor = conn.execute(query, params)
+        conn.execute(
+            "UPDATE jobs SET status = ? WHERE status = ?" + (" AND job_id = ?" if job_id else ""),
+            [PENDING, FAILED] + ([job_id] if job_id else [])
+        )
+    return cursor.rowcount
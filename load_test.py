@@ -0,0 +1,235 @@
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from standin_server import add_server_arguments, state_from_args, start_server
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PROMPTS = [
+    "Change the red rectangle to have a vertical gradient from #ff0000 to #0000ff",
+    "Make the circle green, and give the rectangle a blue-yellow gradient",
+    "Add a vertical red-to-blue gradient to the red rectangle and make the circle have a radial white-to-black gradient",
+    "Give all rectangles sunset gradients",
+]
+
+def normalize_svg(svg):
+    return re.sub(r"\s+", "", svg)
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def run_url(base_url, run_id):
+    """Prefix the API path with /run/<id> so the stand-in server counts this run's calls separately"""
+    origin, path = re.match(r"(https?://[^/]+)(.*)", base_url).groups()
+    return f"{origin}/run/{run_id}{path}"
+
+def run_one(mode, prompts, input_svg, env, base_url, timeout, keep_workdir):
+    """Run the CLI or batch entry point once in its own working directory"""
+    run_id = uuid.uuid4().hex[:12]
+    env = dict(env, GEMINI_API_BASE=run_url(base_url, run_id))
+    workdir = tempfile.mkdtemp(prefix="svg_load_")
+    try:
+        shutil.copy(input_svg, os.path.join(workdir, "input.svg"))
+        if mode == "cli":
+            command = [sys.executable, os.path.join(REPO_DIR, "main.py")]
+            stdin = prompts[0] + "\n"
+        else:
+            with open(os.path.join(workdir, "prompts.txt"), 'w') as f:
+                f.write("\n".join(prompts) + "\n")
+            command = [sys.executable, os.path.join(REPO_DIR, "batch.py"), "prompts.txt", "--output-dir", "out"]
+            stdin = ""
+
+        try:
+            proc = subprocess.run(command, cwd=workdir, env=env, input=stdin, capture_output=True,
+                                  text=True, timeout=timeout)
+            returncode, stdout = proc.returncode, proc.stdout
+        except subprocess.TimeoutExpired as e:
+            returncode, stdout = "timeout", e.stdout or ""
+            if isinstance(stdout, bytes):
+                stdout = stdout.decode("utf-8", "replace")
+
+        if mode == "cli":
+            outputs = [os.path.join(workdir, "output.svg")]
+        else:
+            # One file per job, and every prompt in the batch is a different job
+            outputs = sorted(glob.glob(os.path.join(workdir, "out", "*.svg")))
+        with open(input_svg, 'r') as f:
+            original = normalize_svg(f.read())
+        unchanged = 0
+        for path in outputs:
+            if not os.path.exists(path):
+                unchanged += 1
+                continue
+            with open(path, 'r') as f:
+                if normalize_svg(f.read()) == original:
+                    unchanged += 1
+        # Items that never produced an output file count as unchanged too
+        unchanged += max(0, len(prompts) - len(outputs))
+
+        # Every request the run sent, including ones CrewAI re-sends on its own after
+        # a malformed reply, as counted by the server rather than read from the logs
+        calls = fetch_stats(base_url, run_id)
+        return {
+            "returncode": returncode,
+            "items": len(prompts),
+            "unchanged": unchanged,
+            "llm_calls": calls.get("requests", 0),
+            "llm_429": calls.get("429", 0),
+            "llm_500": calls.get("500", 0),
+            "llm_malformed": calls.get("malformed", 0),
+            "failed_instructions": len(re.findall(r" Instruction \d+ failed:", stdout)),
+        }
+    finally:
+        if keep_workdir:
+            print(f"Kept {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def load_prompts(path):
+    """Return the distinct prompts to cycle through, in file order"""
+    if path:
+        with open(path, 'r') as f:
+            prompts = [line.strip() for line in f if line.strip()]
+    else:
+        prompts = DEFAULT_PROMPTS
+    # A repeated prompt is the same job: batch.py would resume it instead of running it again
+    return list(dict.fromkeys(prompts))
+
+def run_load(args, base_url, prompts):
+    """Issue requests at a fixed arrival rate and collect per-request results"""
+    env = dict(os.environ, GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY", "offline-load-test"),
+               RETRY_BASE_WAIT=str(args.retry_wait),
+               PYTHONUNBUFFERED="1")
+    size = 1 if args.mode == "cli" else args.batch_size
+
+    results = []
+    lock = threading.Lock()
+
+    def task(i, scheduled):
+        # size <= len(prompts), so the prompts within one batch are all different
+        batch = [prompts[(i * size + k) % len(prompts)] for k in range(size)]
+        result = run_one(args.mode, batch, args.input, env, base_url, args.timeout, args.keep_workdirs)
+        # Latency is measured from the scheduled arrival, so queueing behind the concurrency limit counts
+        result["latency"] = time.time() - scheduled
+        with lock:
+            results.append(result)
+            print(f"[{len(results)}/{args.requests}] rc={result['returncode']} "
+                  f"latency={result['latency']:.2f}s llm_calls={result['llm_calls']} "
+                  f"unchanged={result['unchanged']}/{result['items']}")
+
+    start = time.time()
+    futures = []
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i in range(args.requests):
+            scheduled = start + i / args.rate
+            time.sleep(max(0.0, scheduled - time.time()))
+            futures.append(pool.submit(task, i, scheduled))
+
+    # A run that raised still counts, as a failed request with no latency
+    for future in futures:
+        error = future.exception()
+        if error is not None:
+            print(f"Run raised {type(error).__name__}: {error}")
+            results.append({
+                "returncode": "exception", "error": str(error), "items": size, "unchanged": size,
+                "llm_calls": 0, "llm_429": 0, "llm_500": 0, "llm_malformed": 0,
+                "failed_instructions": 0, "latency": None,
+            })
+    return results, time.time() - start
+
+def summarize(results, elapsed, server_stats):
+    """Build the load-test report"""
+    latencies = [r["latency"] for r in results if r["latency"] is not None]
+    items = sum(r["items"] for r in results)
+    return {
+        "requests": len(results),
+        "succeeded": sum(1 for r in results if r["returncode"] == 0),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 3) if elapsed else 0.0,
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p90": round(percentile(latencies, 90), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3) if latencies else 0.0,
+        },
+        "llm_calls": sum(r["llm_calls"] for r in results),
+        "llm_calls_per_item": round(sum(r["llm_calls"] for r in results) / items, 3) if items else 0.0,
+        "llm_errors": {
+            "429": sum(r["llm_429"] for r in results),
+            "500": sum(r["llm_500"] for r in results),
+            "malformed": sum(r["llm_malformed"] for r in results),
+        },
+        "failed_instructions": sum(r["failed_instructions"] for r in results),
+        "unchanged_fraction": round(sum(r["unchanged"] for r in results) / items, 3) if items else 0.0,
+        "server": server_stats,
+    }
+
+def fetch_stats(base_url, run_id=None):
+    """Read counters from a stand-in server's /stats endpoint, for one run if run_id is given"""
+    match = re.match(r"(https?://[^/]+)", base_url)
+    query = f"?run={run_id}" if run_id else ""
+    try:
+        with urllib.request.urlopen(f"{match.group(1)}/stats{query}", timeout=5) as response:
+            return json.loads(response.read())
+    except Exception as e:
+        return {"error": str(e)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the CLI and batch entry points")
+    parser.add_argument("--mode", choices=["cli", "batch"], default="cli", help="entry point to drive")
+    parser.add_argument("--requests", type=int, default=20, help="number of runs to start")
+    parser.add_argument("--rate", type=float, default=1.0, help="runs started per second")
+    parser.add_argument("--concurrency", type=int, default=8, help="maximum runs in flight")
+    parser.add_argument("--batch-size", type=int, default=4, help="prompts per batch.py run (batch mode)")
+    parser.add_argument("--prompts", default=None, help="file with one prompt per line (defaults to README examples)")
+    parser.add_argument("--input", default=os.path.join(REPO_DIR, "input.svg"), help="SVG every run starts from")
+    parser.add_argument("--retry-wait", type=float, default=0.5, help="RETRY_BASE_WAIT for the runs, in seconds")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds before a run is killed")
+    parser.add_argument("--base-url", default=None, help="use an already running stand-in server instead of starting one")
+    parser.add_argument("--keep-workdirs", action="store_true", help="keep each run's working directory")
+    parser.add_argument("--report", default=None, help="also write the JSON report to this file")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    prompts = load_prompts(args.prompts)
+    if not prompts:
+        parser.error("no prompts to run")
+    if args.mode == "batch" and not 1 <= args.batch_size <= len(prompts):
+        parser.error(f"--batch-size must be between 1 and the number of distinct prompts ({len(prompts)})")
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = start_server(state_from_args(args))
+        print(f"Started stand-in server at {base_url}")
+
+    results, elapsed = run_load(args, base_url, prompts)
+    report = summarize(results, elapsed, fetch_stats(base_url))
+    if server is not None:
+        server.shutdown()
+
+    print("\n=== LOAD TEST REPORT ===")
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SVG_RE = re.compile(r"<svg\b.*?</svg>", re.S)
+FILL_RE = re.compile(r"(<(?!svg\b|defs\b|stop\b|linearGradient\b|radialGradient\b)\w+\b[^>]*?\sfill=)(\"[^\"]*\"|'[^']*')")
+STANDIN_DEFS = ('<defs><linearGradient id="standinGrad" x1="0%" y1="0%" x2="0%" y2="100%">'
+                '<stop offset="0%" style="stop-color:#ff0000;stop-opacity:1" />'
+                '<stop offset="100%" style="stop-color:#0000ff;stop-opacity:1" />'
+                '</linearGradient></defs>')
+# Clients may prefix the API path with /run/<id> to get their own counters
+RUN_RE = re.compile(r"^/run/([^/]+)(/.*)$")
+
+def new_stats():
+    return {"requests": 0, "ok": 0, "429": 0, "500": 0, "malformed": 0, "playback": 0}
+
+def parse_latency(spec):
+    """Turn "fixed:0.2", "uniform:0.1,0.5", "exp:0.3" or "lognormal:-1,0.5" into a sampler"""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / values[0])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+def load_playback(path):
+    """Load recorded responses: one JSON object per line with "text" and a "prompt_sha256" or "contains" key"""
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def prompt_text(body):
+    """Flatten a generateContent request body into one string"""
+    parts = []
+    for content in [body.get("system_instruction") or body.get("systemInstruction") or {}] + body.get("contents", []):
+        for part in content.get("parts", []):
+            parts.append(part.get("text", ""))
+    return "\n".join(parts)
+
+def synthetic_reply(prompt):
+    """Answer the way a well-behaved model would for each stage of the pipeline"""
+    if "Break down complex instructions" in prompt:
+        match = re.search(r'Now break down this instruction.*?Input: "(.*)"', prompt, re.S)
+        return json.dumps([match.group(1) if match else "Apply a gradient"])
+
+    if "Parse this gradient instruction" in prompt:
+        answer = json.dumps({
+            "gradient_type": "linear", "direction": "vertical",
+            "start_color": "#ff0000", "end_color": "#0000ff", "target_element": "first filled element"
+        })
+    else:
+        svgs = SVG_RE.findall(prompt)
+        svg = svgs[-1] if svgs else '<svg xmlns="http://www.w3.org/2000/svg"></svg>'
+        if "Modify this SVG" in prompt and "standinGrad" not in svg:
+            svg = FILL_RE.sub(r'\1"url(#standinGrad)"', svg, count=1)
+            svg = re.sub(r"(<svg\b[^>]*>)", r"\1" + STANDIN_DEFS, svg, count=1)
+        answer = svg
+    # CrewAI agents without tools expect a ReAct-style final answer
+    return f"Thought: I now can give a great answer\nFinal Answer: {answer}"
+
+def malformed_reply(rng, text):
+    """Damage a reply the way real models sometimes do"""
+    choice = rng.randrange(3)
+    if choice == 0:
+        return text.replace("Final Answer:", "Answer:")
+    if choice == 1:
+        return text[:max(1, len(text) // 2)]
+    return "I'm sorry, I can't help with that."
+
+class StandinState:
+    """Scripted behaviour and counters shared by all request handlers"""
+
+    def __init__(self, latency="fixed:0", rate_429=0.0, rate_500=0.0, rate_malformed=0.0,
+                 rpm=None, playback=None, seed=None):
+        self.latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.rate_malformed = rate_malformed
+        self.rpm = rpm
+        self.playback = load_playback(playback) if playback else []
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = []
+        self.stats = new_stats()
+        self.runs = {}
+
+    def count(self, key, run=None):
+        with self.lock:
+            self.stats[key] += 1
+            if run is not None:
+                self.runs.setdefault(run, new_stats())[key] += 1
+
+    def run_stats(self, run):
+        """Counters for requests sent under /run/<run>, all zero if there were none"""
+        with self.lock:
+            return dict(self.runs.get(run) or new_stats())
+
+    def decide(self, run=None):
+        """Pick latency and outcome for one request: "429", "500", "malformed" or "ok" """
+        with self.lock:
+            now = time.time()
+            self.stats["requests"] += 1
+            if run is not None:
+                self.runs.setdefault(run, new_stats())["requests"] += 1
+            self.window = [t for t in self.window if now - t < 60]
+            self.window.append(now)
+            over_quota = self.rpm is not None and len(self.window) > self.rpm
+            delay = max(0.0, self.latency(self.rng))
+            roll = self.rng.random()
+        if over_quota or roll < self.rate_429:
+            return delay, "429"
+        roll -= self.rate_429
+        if roll < self.rate_500:
+            return delay, "500"
+        roll -= self.rate_500
+        if roll < self.rate_malformed:
+            return delay, "malformed"
+        return delay, "ok"
+
+    def reply_for(self, prompt, run=None):
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        for record in self.playback:
+            if record.get("prompt_sha256") == digest or ("contains" in record and record["contains"] in prompt):
+                self.count("playback", run)
+                return record["text"]
+        return synthetic_reply(prompt)
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Serves POST .../models/<model>:generateContent like the Gemini API
+
+    GET /stats returns the counters for all requests; GET /stats?run=<id> returns
+    those for requests whose path started with /run/<id>.
+    """
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") == "/stats":
+            run = parse_qs(url.query).get("run")
+            if run:
+                self.send_json(200, self.state.run_stats(run[0]))
+            else:
+                with self.state.lock:
+                    self.send_json(200, dict(self.state.stats))
+        else:
+            self.send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+    def do_POST(self):
+        if ":generateContent" not in self.path:
+            self.send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+        match = RUN_RE.match(self.path)
+        run = match.group(1) if match else None
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        delay, outcome = self.state.decide(run)
+        time.sleep(delay)
+        self.state.count(outcome, run)
+
+        if outcome == "429":
+            self.send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                                           "status": "RESOURCE_EXHAUSTED"}})
+            return
+        if outcome == "500":
+            self.send_json(500, {"error": {"code": 500, "message": "An internal error has occurred.",
+                                           "status": "INTERNAL"}})
+            return
+
+        prompt = prompt_text(body)
+        text = self.state.reply_for(prompt, run)
+        if outcome == "malformed":
+            with self.state.lock:
+                text = malformed_reply(self.state.rng, text)
+        prompt_tokens = len(prompt) // 4
+        reply_tokens = len(text) // 4
+        self.send_json(200, {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": reply_tokens,
+                "totalTokenCount": prompt_tokens + reply_tokens
+            },
+            "modelVersion": "gemini-2.0-flash"
+        })
+
+def start_server(state, host="127.0.0.1", port=0):
+    """Start the stand-in server on a background thread; returns (server, base_url)"""
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://{host}:{server.server_address[1]}/v1beta/models/gemini-2.0-flash"
+    return server, base_url
+
+def add_server_arguments(parser):
+    """Command-line options shared by this server and load_test.py"""
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S, uniform:A,B, exp:MEAN or lognormal:MU,SIGMA (seconds)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-malformed", type=float, default=0.0, help="fraction of replies damaged before sending")
+    parser.add_argument("--rpm", type=int, default=None, help="answer 429 once this many requests arrive within a minute")
+    parser.add_argument("--playback", default=None, help="JSONL file of recorded responses")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for repeatable runs")
+
+def state_from_args(args):
+    return StandinState(args.latency, args.rate_429, args.rate_500, args.rate_malformed,
+                        args.rpm, args.playback, args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini-compatible stand-in server for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_server(state_from_args(args), args.host, args.port)
+    print(f"Stand-in server listening; set GEMINI_API_BASE={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
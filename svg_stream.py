@@ -0,0 +1,229 @@
+import mmap
+import re
+import sys
+from collections import Counter
+
+# Geometry attributes and text longer than this stay in the input file as byte ranges
+RAW_THRESHOLD = 256
+
+# Only bulky geometry is elided; style, class, fill, id and the rest decide how an
+# element is painted, so the agents must always see them
+RAW_ATTRIBUTES = {"d", "points", "transform"}
+
+# Needed for the modifier agent to add and reuse gradients and to see CSS that
+# may override a fill, whatever the targets are
+ALWAYS_KEEP_TAGS = {"svg", "defs", "linearGradient", "radialGradient", "stop", "style"}
+
+COPY_CHUNK = 1 << 20
+
+TOKEN_RE = re.compile(
+    rb"<!--.*?-->|<\?.*?\?>|<!\[CDATA\[.*?\]\]>|<![^>]*>"
+    rb"|</(?P<close>[^\s>]+)\s*>"
+    rb"|<(?P<open>[^\s/>!?]+)(?P<attrs>(?:\s+[^\s=/>]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))*)\s*(?P<empty>/?)>",
+    re.S
+)
+ATTR_RE = re.compile(rb"([^\s=/>]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)')")
+PLACEHOLDER_RE = re.compile(r"<!--raw:(\d+)-->|(?<=[\"'])raw:(\d+)(?=[\"'])")
+
+def placeholder_indices(text):
+    """Return the raw:N indices in a skeleton, in order of appearance"""
+    return [int(m.group(1) or m.group(2)) for m in PLACEHOLDER_RE.finditer(text)]
+
+def check_placeholders(text, count):
+    """Raise ValueError unless each index 0..count-1 appears exactly once in text"""
+    seen = Counter(placeholder_indices(text))
+    missing = [i for i in range(count) if i not in seen]
+    unknown = sorted(i for i in seen if i >= count)
+    duplicated = sorted(i for i, n in seen.items() if n > 1)
+    if missing or unknown or duplicated:
+        raise ValueError(
+            f"Skeleton placeholders damaged (missing {missing}, duplicated {duplicated}, unknown {unknown})"
+        )
+
+class RawRange:
+    """Byte span of the input that is passed through without being parsed"""
+    __slots__ = ("start", "end")
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+class SvgNode:
+    """Compact element: interned tag/attribute strings, children, and whether it self-closed"""
+    __slots__ = ("tag", "attrs", "children", "empty")
+
+    def __init__(self, tag, attrs, empty):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.empty = empty
+
+def _decode(mm, start, end):
+    return mm[start:end].decode("utf-8")
+
+def _append_raw(children, raw):
+    """Append a raw range, coalescing it with a preceding raw range (and whitespace between)"""
+    if len(children) >= 2 and isinstance(children[-2], RawRange) and isinstance(children[-1], str) and not children[-1].strip():
+        children.pop()
+    if children and isinstance(children[-1], RawRange):
+        children[-1].end = raw.end
+    else:
+        children.append(raw)
+
+def _parse_attrs(mm, start, end, threshold):
+    """Return (name, value, quote) triples; long geometry values are kept as RawRange"""
+    attrs = []
+    for match in ATTR_RE.finditer(mm, start, end):
+        group = 2 if match.start(2) != -1 else 3
+        value_start, value_end = match.span(group)
+        name = sys.intern(match.group(1).decode("utf-8"))
+        if name in RAW_ATTRIBUTES and value_end - value_start > threshold:
+            value = RawRange(value_start, value_end)
+        else:
+            value = sys.intern(_decode(mm, value_start, value_end))
+        attrs.append((name, value, '"' if group == 2 else "'"))
+    return tuple(attrs)
+
+def parse_svg_stream(mm, keep_tags=None, threshold=RAW_THRESHOLD):
+    """Incrementally build a compact tree over a memory-mapped SVG
+
+    Large geometry attributes (RAW_ATTRIBUTES) and text outside <style> become
+    RawRange byte spans. When keep_tags is
+    given, every element that is neither in keep_tags/ALWAYS_KEEP_TAGS nor has such
+    a descendant is collapsed into one RawRange as soon as it closes, so memory
+    stays proportional to the part of the document that can be edited.
+    Returns the document-level list of prolog items and the root node.
+    """
+    keep = None if keep_tags is None else set(keep_tags) | ALWAYS_KEEP_TAGS
+    top = []
+    # Stack entries: (node, start offset, whether the subtree has something to keep)
+    stack = []
+    pos = 0
+
+    def in_style():
+        return bool(stack) and stack[-1][0].tag == "style"
+
+    def add_text(start, end):
+        if start >= end:
+            return
+        children = stack[-1][0].children if stack else top
+        if end - start > threshold and not in_style():
+            _append_raw(children, RawRange(start, end))
+        else:
+            children.append(_decode(mm, start, end))
+
+    def close(start, end):
+        node, _, kept = stack.pop()
+        if stack:
+            parent = stack[-1]
+            if keep is None or kept:
+                parent[0].children.append(node)
+                if kept:
+                    stack[-1] = (parent[0], parent[1], True)
+            else:
+                _append_raw(parent[0].children, RawRange(start, end))
+        else:
+            top.append(node)
+
+    for match in TOKEN_RE.finditer(mm):
+        add_text(pos, match.start())
+        pos = match.end()
+        if match.group("open"):
+            tag = sys.intern(match.group("open").decode("utf-8"))
+            attrs = _parse_attrs(mm, match.start("attrs"), match.end("attrs"), threshold)
+            node = SvgNode(tag, attrs, bool(match.group("empty")))
+            stack.append((node, match.start(), keep is None or tag in keep))
+            if node.empty:
+                close(match.start(), match.end())
+        elif match.group("close"):
+            if not stack:
+                raise ValueError(f"Unexpected closing tag at byte {match.start()}")
+            closing = match.group("close").decode("utf-8")
+            if closing != stack[-1][0].tag:
+                raise ValueError(f"</{closing}> at byte {match.start()} does not close <{stack[-1][0].tag}>")
+            close(stack[-1][1], match.end())
+        elif in_style():
+            # CSS is often wrapped in CDATA; keep it readable for the agents
+            stack[-1][0].children.append(_decode(mm, match.start(), match.end()))
+        elif stack:
+            # Comments, CDATA and the like inside the document are passed through
+            _append_raw(stack[-1][0].children, RawRange(match.start(), match.end()))
+        else:
+            top.append(_decode(mm, match.start(), match.end()))
+    add_text(pos, len(mm))
+
+    if stack:
+        raise ValueError(f"Unclosed <{stack[-1][0].tag}> element")
+    roots = [item for item in top if isinstance(item, SvgNode)]
+    if len(roots) != 1 or roots[0].tag != "svg":
+        raise ValueError("Input is not a single <svg> document")
+    return top, roots[0]
+
+class SvgStreamDocument:
+    """A memory-mapped SVG that is edited through a compact skeleton
+
+    skeleton() returns the document with every RawRange replaced by a short
+    placeholder (an attribute value of "raw:N" or a "<!--raw:N-->" comment).
+    write() streams an edited skeleton to disk, copying each placeholder's bytes
+    straight from the memory-mapped input.
+    """
+
+    def __init__(self, path, keep_tags=None, threshold=RAW_THRESHOLD):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.ranges = []
+        self.top, self.root = parse_svg_stream(self.mm, keep_tags, threshold)
+
+    def _placeholder(self, raw):
+        self.ranges.append(raw)
+        return len(self.ranges) - 1
+
+    def _serialize(self, item, out):
+        if isinstance(item, str):
+            out.append(item)
+        elif isinstance(item, RawRange):
+            out.append(f"<!--raw:{self._placeholder(item)}-->")
+        else:
+            out.append(f"<{item.tag}")
+            for name, value, quote in item.attrs:
+                if isinstance(value, RawRange):
+                    value = f"raw:{self._placeholder(value)}"
+                out.append(f" {name}={quote}{value}{quote}")
+            if item.empty and not item.children:
+                out.append("/>")
+                return
+            out.append(">")
+            for child in item.children:
+                self._serialize(child, out)
+            out.append(f"</{item.tag}>")
+
+    def skeleton(self):
+        """Return the compact, editable text of the document"""
+        self.ranges = []
+        out = []
+        for item in self.top:
+            self._serialize(item, out)
+        return "".join(out)
+
+    def write(self, edited_skeleton, path):
+        """Write an edited skeleton, streaming placeholder regions from the input
+
+        Raises ValueError, before touching the output file, if any placeholder
+        is missing, duplicated or unknown.
+        """
+        check_placeholders(edited_skeleton, len(self.ranges))
+        with open(path, "wb") as f:
+            pos = 0
+            for match in PLACEHOLDER_RE.finditer(edited_skeleton):
+                index = int(match.group(1) or match.group(2))
+                f.write(edited_skeleton[pos:match.start()].encode("utf-8"))
+                raw = self.ranges[index]
+                for offset in range(raw.start, raw.end, COPY_CHUNK):
+                    f.write(self.mm[offset:min(offset + COPY_CHUNK, raw.end)])
+                pos = match.end()
+            f.write(edited_skeleton[pos:].encode("utf-8"))
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
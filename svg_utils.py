@@ -1,4 +1,6 @@
-from config import INPUT_SVG_FILE, OUTPUT_SVG_FILE
+import os
+from config import INPUT_SVG_FILE, OUTPUT_SVG_FILE, LARGE_SVG_BYTES
+from svg_stream import SvgStreamDocument
 
 def load_input_svg():
     """Load or create input SVG file"""
@@ -15,8 +17,31 @@ def load_input_svg():
             print(f" Created {INPUT_SVG_FILE}")
         return default_svg
 
-def save_output_svg(svg_content):
+def open_input_svg(keep_tags=None):
+    """Load the input SVG, memory-mapping it if it is large
+
+    Returns (svg_text, document). For large inputs svg_text is the compact
+    skeleton of an SvgStreamDocument (see svg_stream.py) and document must be
+    passed to save_output_svg; otherwise document is None.
+    """
+    if not os.path.exists(INPUT_SVG_FILE) or os.path.getsize(INPUT_SVG_FILE) <= LARGE_SVG_BYTES:
+        return load_input_svg(), None
+    document = SvgStreamDocument(INPUT_SVG_FILE, keep_tags=keep_tags)
+    svg_text = document.skeleton()
+    print(f" Streaming {INPUT_SVG_FILE}: {os.path.getsize(INPUT_SVG_FILE)} bytes -> {len(svg_text)} character skeleton")
+    return svg_text, document
+
+def save_output_svg(svg_content, document=None, path=OUTPUT_SVG_FILE):
     """Save output SVG file"""
-    with open(OUTPUT_SVG_FILE, 'w') as f:
-        f.write(svg_content)
-    print(f"Saved {OUTPUT_SVG_FILE}") 
\ No newline at end of file
+    if document is not None:
+        document.write(svg_content, path)
+    else:
+        with open(path, 'w') as f:
+            f.write(svg_content)
+    print(f"Saved {path}")
+
+def preview_svg(svg_content, limit=2000):
+    """Return the SVG, or its head if it is too long to print"""
+    if len(svg_content) <= limit:
+        return svg_content
+    return f"{svg_content[:limit]}\n... ({len(svg_content) - limit} more characters)"
@@ -0,0 +1,92 @@
+from instruction_planner import plan_instructions, target_svg_tags
+
+def planned(instructions):
+    return plan_instructions(instructions)[0]
+
+def test_drops_step_overwritten_on_same_element():
+    steps = ["Make the circle green", "Give the circle a radial gradient from white to black"]
+    result, report = plan_instructions(steps)
+    assert result == ["Give the circle a radial gradient from white to black"]
+    assert report["crew_runs_avoided"] == 1
+    assert report["llm_calls_avoided"] == 3
+
+def test_drops_exact_repeat():
+    steps = ["Give the rectangle a blue-yellow gradient", "Give the rectangle a blue-yellow gradient"]
+    assert planned(steps) == ["Give the rectangle a blue-yellow gradient"]
+
+def test_ordinal_qualifiers_are_different_elements():
+    steps = ["Make the first rectangle red", "Make the second rectangle blue"]
+    assert planned(steps) == steps
+
+def test_position_qualifiers_are_different_elements():
+    steps = ["Make the left circle red", "Make the right circle blue"]
+    assert planned(steps) == steps
+
+def test_size_qualifiers_are_different_elements():
+    steps = ["Make the big circle red", "Make the small circle blue"]
+    assert planned(steps) == steps
+
+def test_shape_synonyms_are_not_the_same_element():
+    steps = ["Make the triangle red", "Make the star blue"]
+    assert planned(steps) == steps
+
+def test_shape_synonyms_keep_their_order():
+    steps = ["Make the circle blue", "Make the rectangle red", "Make the square blue"]
+    assert planned(steps) == steps
+
+def test_all_of_a_shape_does_not_overwrite_one_element():
+    steps = ["Make the red rectangle blue", "Make all rectangles green"]
+    assert planned(steps) == steps
+
+def test_colour_selection_keeps_order():
+    # The ellipse is picked by a colour the rectangle step sets, so it cannot move before it
+    steps = ["Make the circle blue", "Make the rectangle red", "Make the red ellipse blue"]
+    assert planned(steps) == steps
+
+def test_merges_same_fill_on_independent_elements():
+    steps = ["Make the circle green", "Make the square green"]
+    assert planned(steps) == ["Make the circle and the square green"]
+
+def test_does_not_merge_different_named_gradients():
+    steps = ["Give the rectangle a sunset gradient", "Give the circle an ocean gradient"]
+    assert planned(steps) == steps
+
+def test_does_not_merge_unrecognised_colours():
+    steps = ["Give the rectangle a gradient from coral to salmon", "Give the circle a gradient from khaki to plum"]
+    assert planned(steps) == steps
+
+def test_does_not_merge_different_directions():
+    steps = ["Give the rectangle a red-blue gradient from top to bottom",
+             "Give the circle a red-blue gradient from left to right"]
+    assert planned(steps) == steps
+
+def test_merges_identical_requests_ignoring_case_and_spacing():
+    steps = ["Give the rectangle a blue-yellow gradient", "give the  circle a Blue-Yellow gradient."]
+    assert planned(steps) == ["Give the rectangle and the circle a blue-yellow gradient"]
+
+def test_keeps_border_step():
+    steps = ["Give the circle thick blue borders", "Make the circle red"]
+    assert planned(steps) == steps
+
+def test_keeps_stroke_step():
+    steps = ["Make the circle red with a 2px blue strokes", "Make the circle green"]
+    assert planned(steps) == steps
+
+def test_keeps_resize_step():
+    steps = ["Make the circle larger and green", "Give the circle a radial gradient from white to black"]
+    assert planned(steps) == steps
+
+def test_keeps_step_whose_colour_a_later_step_reads():
+    steps = ["Make the circle red", "Give the circle a gradient from its current color to white"]
+    assert planned(steps) == steps
+
+def test_target_tags_for_recognised_targets():
+    prompt = "Make the circle green, and give the rectangle a blue-yellow gradient"
+    assert target_svg_tags(prompt) == {"circle", "ellipse", "rect"}
+
+def test_target_tags_keep_everything_for_unrecognised_target():
+    assert target_svg_tags("Make the circle and the background green") is None
+    assert target_svg_tags("Make the heart red and the circle blue") is None
+
+def test_target_tags_keep_everything_without_a_target():
+    assert target_svg_tags("Make everything green") is None
@@ -0,0 +1,88 @@
+import pytest
+from svg_stream import SvgStreamDocument
+
+PATH_DATA = "M0 0 " + "L10 10 " * 80
+STYLE = ("fill:#0000ff;fill-opacity:1;fill-rule:nonzero;stroke:#000000;stroke-width:1.5;"
+         "stroke-linecap:round;stroke-linejoin:round;stroke-miterlimit:4;stroke-dasharray:none;"
+         "stroke-dashoffset:0;stroke-opacity:1;paint-order:markers stroke fill;opacity:1;"
+         "mix-blend-mode:normal;filter:none;display:inline;color:#000;enable-background:accumulate")
+CSS = "<style><![CDATA[\n" + "".join(f".c{i} {{ fill: #{i:06x}; }}\n" for i in range(30)) + "]]></style>"
+SVG = (
+    '<?xml version="1.0"?>\n'
+    '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">\n'
+    f"  {CSS}\n"
+    f'  <g id="art"><path d="{PATH_DATA}" class="c1"/></g>\n'
+    f'  <circle id="target" class="c2" style="{STYLE}" r="5"/>\n'
+    "  <text x='1'>hello</text>\n"
+    "</svg>\n"
+)
+
+def open_document(tmp_path, svg=SVG, keep_tags=None):
+    path = tmp_path / "input.svg"
+    path.write_text(svg)
+    return SvgStreamDocument(str(path), keep_tags=keep_tags)
+
+def test_unedited_skeleton_round_trips_byte_for_byte(tmp_path):
+    for keep_tags in (None, {"circle"}):
+        document = open_document(tmp_path, keep_tags=keep_tags)
+        out = tmp_path / "output.svg"
+        document.write(document.skeleton(), str(out))
+        document.close()
+        assert out.read_bytes() == SVG.encode("utf-8")
+
+def test_path_data_is_elided(tmp_path):
+    document = open_document(tmp_path)
+    skeleton = document.skeleton()
+    document.close()
+    assert 'd="raw:0"' in skeleton
+    assert PATH_DATA not in skeleton
+
+def test_style_attribute_and_style_block_stay_visible(tmp_path):
+    document = open_document(tmp_path, keep_tags={"circle"})
+    skeleton = document.skeleton()
+    document.close()
+    assert f'style="{STYLE}"' in skeleton
+    assert CSS in skeleton
+
+def test_untargeted_subtrees_are_collapsed(tmp_path):
+    document = open_document(tmp_path, keep_tags={"circle"})
+    skeleton = document.skeleton()
+    document.close()
+    assert "<g" not in skeleton
+    assert "<text" not in skeleton
+    assert '<circle id="target"' in skeleton
+    assert skeleton.count("<!--raw:") == 2
+
+def test_edits_are_written_around_elided_content(tmp_path):
+    document = open_document(tmp_path, keep_tags={"circle"})
+    skeleton = document.skeleton().replace('r="5"', 'r="5" fill="url(#g1)"')
+    out = tmp_path / "output.svg"
+    document.write(skeleton, str(out))
+    document.close()
+    assert out.read_text() == SVG.replace('r="5"', 'r="5" fill="url(#g1)"')
+
+def test_missing_placeholder_is_rejected(tmp_path):
+    document = open_document(tmp_path, keep_tags={"circle"})
+    skeleton = document.skeleton().replace("<!--raw:1-->", "")
+    with pytest.raises(ValueError, match="missing \\[1\\]"):
+        document.write(skeleton, str(tmp_path / "output.svg"))
+    document.close()
+    assert not (tmp_path / "output.svg").exists()
+
+def test_duplicated_placeholder_is_rejected(tmp_path):
+    document = open_document(tmp_path, keep_tags={"circle"})
+    skeleton = document.skeleton().replace("<!--raw:0-->", "<!--raw:0--><!--raw:0-->")
+    with pytest.raises(ValueError, match="duplicated \\[0\\]"):
+        document.write(skeleton, str(tmp_path / "output.svg"))
+    document.close()
+
+def test_unknown_placeholder_is_rejected(tmp_path):
+    document = open_document(tmp_path, keep_tags={"circle"})
+    skeleton = document.skeleton().replace("</svg>", "<!--raw:9--></svg>")
+    with pytest.raises(ValueError, match="unknown \\[9\\]"):
+        document.write(skeleton, str(tmp_path / "output.svg"))
+    document.close()
+
+def test_mismatched_closing_tag_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="does not close <g>"):
+        open_document(tmp_path, svg="<svg><g><rect/></circle></svg>")